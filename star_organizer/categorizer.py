@@ -1,19 +1,27 @@
-import threading
+import asyncio
+import hashlib
+import json
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import structlog
 from langchain.chat_models import init_chat_model
+from openai import OpenAI
 
+from star_organizer.llm_cache import LLM_CACHE
 from star_organizer.models import (
+    BATCH_POLL_INTERVAL_SECONDS,
+    BATCH_POLL_MAX_ERRORS,
     BATCH_SAVE_INTERVAL,
+    BATCH_STATE_SUFFIX,
     MAX_CATEGORIZATION_RETRIES,
     MAX_GITHUB_LISTS,
     MAX_TOPICS_TO_INCLUDE,
-    OPENAI_API_KEY,
+    OPENAI_MODEL,
     PARALLEL_CATEGORIZATION_WORKERS,
     RETRY_DELAY_SECONDS,
+    SETTINGS,
     AllCategories,
     OrganizedStarLists,
     RepoMetadata,
@@ -22,12 +30,14 @@ from star_organizer.models import (
 
 LOGGER = structlog.get_logger()
 
+ProgressFn = Callable[[int, int], None]
+
 
 def _init_model(schema: Any) -> Any:
     model = init_chat_model(
-        model="gpt-4.1-2025-04-14",
+        model=OPENAI_MODEL,
         model_provider="openai",
-        api_key=OPENAI_API_KEY,
+        api_key=SETTINGS.openai_api_key,
         temperature=0,
     )
     return model.with_structured_output(schema)
@@ -84,7 +94,7 @@ def _build_existing_lists_section(existing_star_lists: Dict[str, str]) -> str:
     return "\n".join(section_lines)
 
 
-def create_categories(repos_metadata: List[RepoMetadata]) -> Dict[str, str]:
+def create_categories(repos_metadata: List[RepoMetadata], refresh_cache: bool = False) -> Dict[str, str]:
     LOGGER.info("creating_categories", total_repos=len(repos_metadata))
 
     repos_formatted = []
@@ -194,6 +204,12 @@ def create_categories(repos_metadata: List[RepoMetadata]) -> Dict[str, str]:
     Return EXACTLY 32 categories that will organize all {len(repos_metadata)} repositories effectively.
     """
 
+    cache_key = LLM_CACHE.make_key(OPENAI_MODEL, AllCategories, prompt)
+    cached = None if refresh_cache else LLM_CACHE.get(cache_key, AllCategories)
+    if cached is not None:
+        LOGGER.info('categories_loaded_from_cache', count=len(cached.categories))
+        return {cat.name: cat.description for cat in cached.categories}
+
     llm = _init_model(AllCategories)
     max_attempts = 5
     for attempt in range(1, max_attempts + 1):
@@ -204,6 +220,7 @@ def create_categories(repos_metadata: List[RepoMetadata]) -> Dict[str, str]:
             LOGGER.info('categories_generated', count=count, attempt=attempt)
 
             if count <= MAX_GITHUB_LISTS:
+                LLM_CACHE.set(cache_key, all_categories)
                 for cat_name, cat_desc in sorted(categories_dict.items()):
                     LOGGER.info('category_defined', name=cat_name, description=cat_desc)
                 return categories_dict
@@ -222,9 +239,7 @@ def create_categories(repos_metadata: List[RepoMetadata]) -> Dict[str, str]:
     return trimmed
 
 
-def _build_assignment_prompt(repository_url: str, repository_context: str, existing_star_lists: Dict[str, str]) -> str:
-    existing_lists_section = _build_existing_lists_section(existing_star_lists)
-
+def _build_assignment_prompt(repository_url: str, repository_context: str, existing_lists_section: str) -> str:
     return f"""
         You are an expert at organizing GitHub Stars into meaningful, technology-specific lists.
 
@@ -357,25 +372,61 @@ def _build_assignment_prompt(repository_url: str, repository_context: str, exist
         """
 
 
-def categorize_repos(
+def _assign_to_category(
+    organized: OrganizedStarLists,
+    url: str,
+    repo_name: str,
+    assignment: StarListAssignment,
+    category_names: str,
+) -> bool:
+    target = assignment.name
+    if target not in organized:
+        LOGGER.warning("category_not_in_predefined_list_using_fallback",
+                      attempted_list=target,
+                      available_categories=category_names)
+        target = "DEVELOPER_TOOLS"
+        if target not in organized:
+            available = list(organized.keys())
+            if not available:
+                return False
+            target = available[0]
+            LOGGER.warning("developer_tools_not_found_using_first_category", fallback=target)
+
+    organized[target]["repos"].append({
+        "url": url,
+        "description": assignment.repo_description,
+        "reasoning": assignment.reasoning,
+    })
+
+    LOGGER.info(
+        "repository_categorized",
+        repository=repo_name,
+        assigned_to_list=target,
+        list_description=assignment.description,
+        created_new_list=False,
+    )
+    return True
+
+
+async def _categorize_repos_async(
     repos_metadata: List[RepoMetadata],
     organized: OrganizedStarLists,
     save_fn,
     save_path: str,
+    on_progress: Optional[ProgressFn] = None,
+    refresh_cache: bool = False,
 ) -> int:
     LOGGER.info("starting_categorization", repos=len(repos_metadata), workers=PARALLEL_CATEGORIZATION_WORKERS)
 
     categorized_count = 0
-    lock = threading.Lock()
-    list_descriptions = {name: data["description"] for name, data in organized.items()}
-    thread_local = threading.local()
-
-    def get_model():
-        if not hasattr(thread_local, "model"):
-            thread_local.model = _init_model(StarListAssignment)
-        return thread_local.model
+    existing_lists_section = _build_existing_lists_section(
+        {name: data["description"] for name, data in organized.items()}
+    )
+    category_names = ", ".join(sorted(organized.keys()))
+    model = _init_model(StarListAssignment)
+    semaphore = asyncio.Semaphore(PARALLEL_CATEGORIZATION_WORKERS)
 
-    def process_repo(idx: int, meta: RepoMetadata):
+    async def process_repo(idx: int, meta: RepoMetadata):
         url = meta.get("url", "")
         if not url:
             return None
@@ -396,75 +447,319 @@ def categorize_repos(
             reasoning="Fallback categorization due to processing error",
         )
 
+        prompt = _build_assignment_prompt(url, context, existing_lists_section)
+        cache_key = LLM_CACHE.make_key(OPENAI_MODEL, StarListAssignment, prompt)
+        cached = None if refresh_cache else LLM_CACHE.get(cache_key, StarListAssignment)
+        if cached is not None:
+            return (url, meta.get("name", ""), cached)
+
         for attempt in range(MAX_CATEGORIZATION_RETRIES):
             try:
-                prompt = _build_assignment_prompt(url, context, list_descriptions)
-                assignment = get_model().invoke(prompt)
+                assignment = await model.ainvoke(prompt)
                 assignment.name = _sanitize_name(assignment.name)
                 if assignment.name and assignment.name != "UNCATEGORIZED":
+                    LLM_CACHE.set(cache_key, assignment)
                     return (url, meta.get("name", ""), assignment)
                 if attempt < MAX_CATEGORIZATION_RETRIES - 1:
                     LOGGER.warning("invalid_list_name_retrying", url=url, attempt=attempt + 1)
-                    time.sleep(RETRY_DELAY_SECONDS)
+                    await asyncio.sleep(RETRY_DELAY_SECONDS)
             except Exception as e:
                 LOGGER.warning("categorization_failed_retrying", url=url, attempt=attempt + 1, error=str(e))
                 if attempt < MAX_CATEGORIZATION_RETRIES - 1:
-                    time.sleep(RETRY_DELAY_SECONDS)
+                    await asyncio.sleep(RETRY_DELAY_SECONDS)
 
         LOGGER.error("categorization_failed_using_fallback", url=url)
         return (url, meta.get("name", ""), fallback)
 
-    with ThreadPoolExecutor(max_workers=PARALLEL_CATEGORIZATION_WORKERS) as executor:
-        future_map = {
-            executor.submit(process_repo, i + 1, meta): (i + 1, meta)
-            for i, meta in enumerate(repos_metadata)
-        }
-        for future in as_completed(future_map):
+    async def run_one(idx: int, meta: RepoMetadata):
+        async with semaphore:
             try:
-                result = future.result()
+                return await process_repo(idx, meta)
             except Exception as e:
-                idx, meta = future_map[future]
                 LOGGER.error("categorization_worker_failed", index=idx, error=str(e))
-                continue
-
-            if result is None:
-                continue
-
-            url, repo_name, assignment = result
-
-            with lock:
-                target = assignment.name
-                if target not in organized:
-                    LOGGER.warning("category_not_in_predefined_list_using_fallback",
-                                  attempted_list=target,
-                                  available_categories=', '.join(sorted(organized.keys())))
-                    target = "DEVELOPER_TOOLS"
-                    if target not in organized:
-                        available = list(organized.keys())
-                        if available:
-                            target = available[0]
-                            LOGGER.warning("developer_tools_not_found_using_first_category", fallback=target)
-                        else:
-                            continue
-
-                organized[target]["repos"].append({
-                    "url": url,
-                    "description": assignment.repo_description,
-                    "reasoning": assignment.reasoning,
-                })
-                categorized_count += 1
+                return None
+
+    pending = [run_one(i + 1, meta) for i, meta in enumerate(repos_metadata)]
+    for future in asyncio.as_completed(pending):
+        result = await future
+        if result is None:
+            continue
+
+        url, repo_name, assignment = result
+        if not _assign_to_category(organized, url, repo_name, assignment, category_names):
+            continue
+        categorized_count += 1
+        if on_progress:
+            on_progress(categorized_count, len(repos_metadata))
+
+        if categorized_count % BATCH_SAVE_INTERVAL == 0:
+            await asyncio.to_thread(save_fn, save_path, organized)
+            LOGGER.info("progress_checkpoint_saved", categorized_so_far=categorized_count)
+
+    save_fn(save_path, organized)
+    return categorized_count
+
+
+def categorize_repos(
+    repos_metadata: List[RepoMetadata],
+    organized: OrganizedStarLists,
+    save_fn,
+    save_path: str,
+    on_progress: Optional[ProgressFn] = None,
+    refresh_cache: bool = False,
+) -> int:
+    return asyncio.run(
+        _categorize_repos_async(repos_metadata, organized, save_fn, save_path, on_progress, refresh_cache)
+    )
+
+
+def _batch_response_format() -> Dict[str, Any]:
+    schema = StarListAssignment.model_json_schema()
+    schema["additionalProperties"] = False
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "StarListAssignment", "schema": schema, "strict": True},
+    }
+
+
+_BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _batch_fingerprint(requests_jsonl: List[str]) -> str:
+    return hashlib.sha256("\n".join(requests_jsonl).encode("utf-8")).hexdigest()
+
+
+def _load_batch_state(path: str) -> Tuple[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        return state.get("batch_id", ""), state.get("fingerprint", "")
+    except FileNotFoundError:
+        return "", ""
+    except Exception as e:
+        LOGGER.warning("batch_state_load_failed", file=path, error=str(e))
+        return "", ""
+
+
+def _save_batch_state(path: str, batch_id: str, fingerprint: str) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "fingerprint": fingerprint}, f)
+    except Exception as e:
+        LOGGER.error("batch_state_save_failed", file=path, batch_id=batch_id, error=str(e))
 
-                LOGGER.info(
-                    "repository_categorized",
-                    repository=repo_name,
-                    assigned_to_list=target,
-                    list_description=assignment.description,
-                    created_new_list=False,
-                )
 
-                if categorized_count % BATCH_SAVE_INTERVAL == 0:
-                    save_fn(save_path, organized)
-                    LOGGER.info("progress_checkpoint_saved", categorized_so_far=categorized_count)
+def _clear_batch_state(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        LOGGER.warning("batch_state_clear_failed", file=path, error=str(e))
+
+
+def _submit_batch(client: OpenAI, requests_jsonl: List[str]) -> str:
+    payload = ("\n".join(requests_jsonl) + "\n").encode("utf-8")
+    input_file = client.files.create(file=("categorize.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    LOGGER.info("batch_submitted", batch_id=batch.id, requests=len(requests_jsonl))
+    return batch.id
+
+
+def _wait_for_batch(client: OpenAI, batch_id: str, on_progress: Optional[ProgressFn] = None) -> Optional[Any]:
+    errors = 0
+    while True:
+        try:
+            batch = client.batches.retrieve(batch_id)
+        except Exception as e:
+            errors += 1
+            LOGGER.warning("batch_poll_failed", batch_id=batch_id, attempt=errors, error=str(e))
+            if errors >= BATCH_POLL_MAX_ERRORS:
+                return None
+            time.sleep(BATCH_POLL_INTERVAL_SECONDS)
+            continue
+        errors = 0
+
+        counts = batch.request_counts
+        completed = counts.completed if counts else 0
+        LOGGER.info(
+            "batch_status",
+            batch_id=batch_id,
+            status=batch.status,
+            completed=completed,
+            failed=counts.failed if counts else 0,
+        )
+        if on_progress:
+            on_progress(completed, counts.total if counts else 0)
+        if batch.status in _BATCH_TERMINAL_STATUSES:
+            return batch
+        time.sleep(BATCH_POLL_INTERVAL_SECONDS)
+
+
+def _read_batch_results(client: OpenAI, batch: Any) -> Dict[str, str]:
+    if not batch.output_file_id:
+        LOGGER.error("batch_failed", batch_id=batch.id, status=batch.status)
+        return {}
+
+    results: Dict[str, str] = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            body = (record.get("response") or {}).get("body") or {}
+            results[record["custom_id"]] = body["choices"][0]["message"]["content"]
+        except Exception as e:
+            LOGGER.warning("batch_result_unparseable", error=str(e))
+    return results
+
+
+def _discard_batch(client: OpenAI, batch_id: str, state_file: str) -> None:
+    LOGGER.warning("batch_state_discarded", batch_id=batch_id, state_file=state_file)
+    try:
+        client.batches.cancel(batch_id)
+    except Exception as e:
+        LOGGER.info("batch_cancel_skipped", batch_id=batch_id, error=str(e))
+    _clear_batch_state(state_file)
+
+
+def _run_batch_job(
+    requests_jsonl: List[str],
+    state_file: str,
+    on_progress: Optional[ProgressFn] = None,
+    refresh_cache: bool = False,
+) -> Optional[Dict[str, str]]:
+    client = OpenAI(api_key=SETTINGS.openai_api_key)
+    fingerprint = _batch_fingerprint(requests_jsonl)
+
+    batch_id, saved_fingerprint = _load_batch_state(state_file)
+    if batch_id and (refresh_cache or saved_fingerprint != fingerprint):
+        _discard_batch(client, batch_id, state_file)
+        batch_id = ""
+
+    if batch_id:
+        LOGGER.info("batch_resumed", batch_id=batch_id, state_file=state_file)
+    else:
+        try:
+            batch_id = _submit_batch(client, requests_jsonl)
+        except Exception as e:
+            LOGGER.error("batch_submit_failed", error=str(e))
+            return {}
+        _save_batch_state(state_file, batch_id, fingerprint)
+
+    batch = _wait_for_batch(client, batch_id, on_progress)
+    if batch is None:
+        LOGGER.error("batch_unresolved_rerun_to_resume", batch_id=batch_id, state_file=state_file)
+        return None
+
+    try:
+        results = _read_batch_results(client, batch)
+    except Exception as e:
+        LOGGER.error("batch_results_download_failed", batch_id=batch_id, error=str(e))
+        return None
+
+    _clear_batch_state(state_file)
+    return results
+
+
+def batch_categorize(
+    repos_metadata: List[RepoMetadata],
+    organized: OrganizedStarLists,
+    save_fn,
+    save_path: str,
+    on_progress: Optional[ProgressFn] = None,
+    refresh_cache: bool = False,
+) -> int:
+    LOGGER.info("starting_batch_categorization", repos=len(repos_metadata))
+
+    categorized_count = 0
+    existing_lists_section = _build_existing_lists_section(
+        {name: data["description"] for name, data in organized.items()}
+    )
+    category_names = ", ".join(sorted(organized.keys()))
+
+    response_format = _batch_response_format()
+
+    pending: Dict[str, Tuple[RepoMetadata, str]] = {}
+    requests_jsonl: List[str] = []
+    for meta in repos_metadata:
+        url = meta.get("url", "")
+        if not url or url in pending:
+            continue
+        prompt = _build_assignment_prompt(url, _build_context(meta), existing_lists_section)
+        cache_key = LLM_CACHE.make_key(OPENAI_MODEL, StarListAssignment, prompt)
+        cached = None if refresh_cache else LLM_CACHE.get(cache_key, StarListAssignment)
+        if cached is not None:
+            if _assign_to_category(organized, url, meta.get("name", ""), cached, category_names):
+                categorized_count += 1
+                if on_progress:
+                    on_progress(categorized_count, len(repos_metadata))
+            continue
+        pending[url] = (meta, cache_key)
+        requests_jsonl.append(json.dumps({
+            "custom_id": url,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": OPENAI_MODEL,
+                "temperature": 0,
+                "messages": [{"role": "user", "content": prompt}],
+                "response_format": response_format,
+            },
+        }))
+
+    results: Dict[str, str] = {}
+    if requests_jsonl:
+        done_before = categorized_count
+        batch_progress = (
+            (lambda done, _total: on_progress(done_before + done, len(repos_metadata)))
+            if on_progress
+            else None
+        )
+        job_results = _run_batch_job(
+            requests_jsonl, f"{save_path}{BATCH_STATE_SUFFIX}", batch_progress, refresh_cache
+        )
+        if job_results is None:
+            save_fn(save_path, organized)
+            return categorized_count
+        results = job_results
+
+    failed: List[RepoMetadata] = []
+    for url, (meta, cache_key) in pending.items():
+        try:
+            assignment = StarListAssignment.model_validate_json(results[url])
+        except Exception:
+            failed.append(meta)
+            continue
+        assignment.name = _sanitize_name(assignment.name)
+        if not assignment.name or assignment.name == "UNCATEGORIZED":
+            failed.append(meta)
+            continue
+        if assignment.name not in organized:
+            LOGGER.warning("batch_assignment_unknown_category", url=url, attempted_list=assignment.name)
+            failed.append(meta)
+            continue
+        LLM_CACHE.set(cache_key, assignment)
+        if _assign_to_category(organized, url, meta.get("name", ""), assignment, category_names):
+            categorized_count += 1
+            if on_progress:
+                on_progress(categorized_count, len(repos_metadata))
 
     save_fn(save_path, organized)
+
+    if failed:
+        LOGGER.warning("batch_categorization_falling_back_to_online", repos=len(failed))
+        done_before = categorized_count
+        fallback_progress = (
+            (lambda done, _total: on_progress(done_before + done, len(repos_metadata)))
+            if on_progress
+            else None
+        )
+        categorized_count += categorize_repos(
+            failed, organized, save_fn, save_path, fallback_progress, refresh_cache
+        )
     return categorized_count
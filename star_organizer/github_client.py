@@ -1,79 +1,125 @@
+import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
 import requests
 import structlog
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from star_organizer.models import (
     GITHUB_API_TIMEOUT_SECONDS,
-    GITHUB_TOKEN,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_SIZE,
+    HTTP_RETRY_BACKOFF,
     PARALLEL_METADATA_WORKERS,
     README_LINES_TO_FETCH,
+    SETTINGS,
+    STARRED_PAGE_WORKERS,
     RepoMetadata,
 )
 
 LOGGER = structlog.get_logger()
 
+_LAST_PAGE_RE = re.compile(r"[?&]page=(\d+)")
+
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=[429, 502, 503, 504],
+        ),
+    ),
+)
+
 
 def _auth_headers(accept: str) -> Dict[str, str]:
     return {
         "Accept": accept,
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
+        "Authorization": f"Bearer {SETTINGS.github_token}",
         "X-GitHub-Api-Version": "2022-11-28",
     }
 
 
+def _fetch_starred_page(page: int, per_page: int, headers: Dict[str, str]) -> Optional[requests.Response]:
+    LOGGER.info("fetching_page", page=page)
+    try:
+        response = _SESSION.get(
+            "https://api.github.com/user/starred",
+            headers=headers,
+            params={"per_page": per_page, "page": page},
+            timeout=30,
+        )
+    except Exception as e:
+        LOGGER.error("request_failed", page=page, error=str(e))
+        return None
+    if response.status_code != 200:
+        LOGGER.error("fetch_failed", page=page, status=response.status_code)
+        return None
+    return response
+
+
+def _last_page(response: requests.Response) -> int:
+    m = _LAST_PAGE_RE.search(response.links.get("last", {}).get("url", ""))
+    return int(m.group(1)) if m else 1
+
+
+def _page_repos(page: int, response: Optional[requests.Response]) -> Optional[List[Dict[str, Any]]]:
+    if response is None:
+        return None
+    try:
+        return response.json() or []
+    except Exception as e:
+        LOGGER.error("request_failed", page=page, error=str(e))
+        return None
+
+
 def fetch_starred_repos(limit: int = 0) -> List[Dict[str, Any]]:
-    if not GITHUB_TOKEN:
+    if not SETTINGS.github_token:
         LOGGER.error("missing_github_token")
         return []
 
-    all_repos: List[Dict[str, Any]] = []
-    page = 1
     per_page = 100
     headers = _auth_headers("application/vnd.github+json")
 
-    while True:
-        LOGGER.info("fetching_page", page=page)
-        try:
-            response = requests.get(
-                "https://api.github.com/user/starred",
-                headers=headers,
-                params={"per_page": per_page, "page": page},
-                timeout=30,
-            )
-            if response.status_code != 200:
-                LOGGER.error("fetch_failed", page=page, status=response.status_code)
-                break
-
-            repos = response.json()
+    first = _fetch_starred_page(1, per_page, headers)
+    all_repos = _page_repos(1, first)
+    if not all_repos:
+        return []
+    LOGGER.info("fetched_repos", page=1, count=len(all_repos))
+
+    last_page = _last_page(first)
+    if limit:
+        last_page = min(last_page, -(-limit // per_page))
+
+    pages = list(range(2, last_page + 1))
+    if pages:
+        with ThreadPoolExecutor(max_workers=min(STARRED_PAGE_WORKERS, len(pages))) as executor:
+            responses = list(executor.map(lambda p: _fetch_starred_page(p, per_page, headers), pages))
+        for page, response in zip(pages, responses):
+            repos = _page_repos(page, response)
             if not repos:
                 break
-
             LOGGER.info("fetched_repos", page=page, count=len(repos))
             all_repos.extend(repos)
 
-            if limit and len(all_repos) >= limit:
-                all_repos = all_repos[:limit]
-                LOGGER.info("test_limit_reached", limit=limit)
-                break
-
-            if len(repos) < per_page:
-                break
-
-            page += 1
-        except Exception as e:
-            LOGGER.error("request_failed", page=page, error=str(e))
-            break
+    if limit and len(all_repos) >= limit:
+        all_repos = all_repos[:limit]
+        LOGGER.info("test_limit_reached", limit=limit)
 
     return all_repos
 
 
 def _fetch_readme(full_name: str) -> str:
-    if not full_name or not GITHUB_TOKEN:
+    if not full_name or not SETTINGS.github_token:
         return ""
     try:
-        resp = requests.get(
+        resp = _SESSION.get(
             f"https://api.github.com/repos/{full_name}/readme",
             headers=_auth_headers("application/vnd.github.raw"),
             timeout=GITHUB_API_TIMEOUT_SECONDS,
@@ -99,18 +145,28 @@ def _build_metadata(repo: Dict[str, Any], readme: str) -> RepoMetadata:
     }
 
 
-def extract_repos_metadata(repos: List[Dict[str, Any]]) -> List[RepoMetadata]:
+def extract_repos_metadata(
+    repos: List[Dict[str, Any]],
+    skip_readme_urls: Optional[Set[str]] = None,
+) -> List[RepoMetadata]:
     if not repos:
         return []
 
-    LOGGER.info("starting_metadata_extraction", total=len(repos), workers=PARALLEL_METADATA_WORKERS)
+    skip = skip_readme_urls or set()
     results: List[RepoMetadata] = [_build_metadata(r, "") for r in repos]
+    to_fetch = [idx for idx, repo in enumerate(repos) if repo.get("html_url", "") not in skip]
+    LOGGER.info(
+        "starting_metadata_extraction",
+        total=len(repos),
+        readmes=len(to_fetch),
+        workers=PARALLEL_METADATA_WORKERS,
+    )
     completed = 0
 
     with ThreadPoolExecutor(max_workers=PARALLEL_METADATA_WORKERS) as executor:
         future_to_idx = {
-            executor.submit(_fetch_readme, repo.get("full_name", "")): idx
-            for idx, repo in enumerate(repos)
+            executor.submit(_fetch_readme, repos[idx].get("full_name", "")): idx
+            for idx in to_fetch
         }
         for future in as_completed(future_to_idx):
             idx = future_to_idx[future]
@@ -122,7 +178,7 @@ def extract_repos_metadata(repos: List[Dict[str, Any]]) -> List[RepoMetadata]:
 
             completed += 1
             if completed % 50 == 0:
-                LOGGER.info("metadata_progress", completed=completed, total=len(repos))
+                LOGGER.info("metadata_progress", completed=completed, total=len(to_fetch))
 
     LOGGER.info("metadata_extraction_complete", total=len(results))
     return results
@@ -1,5 +1,4 @@
 import json
-import re
 import subprocess
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -12,6 +11,7 @@ from star_organizer.models import (
     CREATE_BATCH_SIZE,
     GH_TIMEOUT,
     GITHUB_ERROR_RETRY_DELAY,
+    GITHUB_REPO_URL_RE,
     LIST_MAX_WORKERS,
     MAX_GQL_RETRIES,
     MAX_SYNC_WORKERS,
@@ -115,8 +115,7 @@ def _run_graphql_with_retries(
 
 
 def parse_repo_url(url: str) -> Tuple[str, str]:
-    s = url.strip().replace(".git", "")
-    m = re.search(r"github\.com[:/]+([^/]+)/([^/?#]+)", s, re.IGNORECASE)
+    m = GITHUB_REPO_URL_RE.search(url.strip().replace(".git", ""))
     if not m:
         return "", ""
     return m.group(1), m.group(2)
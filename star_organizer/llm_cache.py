@@ -0,0 +1,77 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional, Type, TypeVar
+
+import structlog
+from pydantic import BaseModel
+
+from star_organizer.models import LLM_CACHE_FILE
+
+LOGGER = structlog.get_logger()
+
+SCHEMA_VERSION = "1"
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class LLMCache:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response BLOB NOT NULL, created_at INTEGER NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def use_path(self, path: str) -> None:
+        with self._lock:
+            if path == self.path:
+                return
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self.path = path
+
+    @staticmethod
+    def make_key(model: str, schema: Type[BaseModel], prompt: str) -> str:
+        raw = "\0".join([model, schema.__name__, SCHEMA_VERSION, prompt])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, schema: Type[T]) -> Optional[T]:
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None:
+                return None
+            return schema.model_validate_json(row[0])
+        except Exception as e:
+            LOGGER.warning("llm_cache_read_failed", file=self.path, error=str(e))
+            return None
+
+    def set(self, key: str, value: BaseModel) -> None:
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, value.model_dump_json(), int(time.time())),
+                )
+                conn.commit()
+        except Exception as e:
+            LOGGER.warning("llm_cache_write_failed", file=self.path, error=str(e))
+
+
+LLM_CACHE = LLMCache(LLM_CACHE_FILE)
@@ -1,9 +1,8 @@
 import logging
 import sys
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import questionary
-import structlog
 import typer
 
 from star_organizer.display import (
@@ -16,18 +15,11 @@ from star_organizer.display import (
     print_summary,
 )
 from star_organizer.models import OUTPUT_FILE, SYNC_STATE_FILE
-from star_organizer.pipeline import (
-    create_backup,
-    phase_1_fetch_and_load,
-    phase_2_metadata,
-    phase_3_categorize,
-    phase_4_sync,
-    validate_tokens,
-)
-from star_organizer.store import load_organized_stars, load_sync_state
 
 
 def _quiet_logs():
+    import structlog
+
     structlog.configure(
         wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING),
     )
@@ -63,6 +55,8 @@ ACTIONS = [
 
 
 def _preview(output_file: str):
+    from star_organizer.store import load_organized_stars
+
     organized = load_organized_stars(output_file)
     if not organized:
         print_error(f"No organized stars found at [bold]{output_file}[/bold]. Run the pipeline first.")
@@ -79,14 +73,28 @@ def _run(
     output_file: str = OUTPUT_FILE,
     state_file: str = SYNC_STATE_FILE,
     quiet: bool = True,
+    skip_validate: bool = False,
+    batch: bool = False,
 ):
+    # Deferred so `--help` and the menu don't pay for langchain/requests imports.
+    from star_organizer.pipeline import (
+        create_backup,
+        phase_1_fetch_and_load,
+        phase_2_metadata,
+        phase_3_categorize,
+        phase_4_sync,
+        validate_tokens,
+    )
+    from star_organizer.store import load_organized_stars, load_sync_state
+
     if quiet:
         _quiet_logs()
 
-    ok, err = validate_tokens(sync_only=sync_only)
-    if not ok:
-        print_error(err)
-        raise typer.Exit(1)
+    if not skip_validate:
+        ok, err = validate_tokens(sync_only=sync_only)
+        if not ok:
+            print_error(err)
+            raise typer.Exit(1)
 
     console.print()
 
@@ -104,9 +112,11 @@ def _run(
         if not organized:
             print_error(f"No organized data at [bold]{output_file}[/bold]")
             raise typer.Exit(1)
-        already_synced = set() if reset else load_sync_state(state_file)
+        already_synced, compact_state = (set(), False) if reset else load_sync_state(state_file)
         with console.status("[bold blue]Syncing to GitHub...[/bold blue]"):
-            total, success, skipped_cats = phase_4_sync(organized, already_synced, reset, state_file)
+            total, success, skipped_cats = phase_4_sync(
+                organized, already_synced, reset, state_file, compact_state
+            )
         print_phase(4, "GitHub Sync", {"synced": success, "total": total})
         if skipped_cats:
             print_error(f"{skipped_cats} categor{'y' if skipped_cats == 1 else 'ies'} skipped (missing list IDs)")
@@ -114,7 +124,7 @@ def _run(
         return
 
     with console.status("[bold blue]Phase 1 — Fetching starred repos...[/bold blue]"):
-        repos, organized, already_synced = phase_1_fetch_and_load(
+        repos, organized, already_synced, categorized_urls, compact_state = phase_1_fetch_and_load(
             reset, state_file, output_file, test_limit
         )
 
@@ -129,7 +139,7 @@ def _run(
     })
 
     with console.status("[bold blue]Phase 2 — Extracting metadata...[/bold blue]"):
-        all_metadata, new_metadata = phase_2_metadata(repos, organized, reset)
+        all_metadata, new_metadata = phase_2_metadata(repos, organized, categorized_urls, reset)
 
     print_phase(2, "Metadata", {
         "total": len(all_metadata),
@@ -138,9 +148,13 @@ def _run(
 
     with console.status(
         f"[bold blue]Phase 3 — Categorizing {len(new_metadata)} repos with AI...[/bold blue]"
-    ):
+    ) as status:
         organized = phase_3_categorize(
-            all_metadata, new_metadata, organized, reset, output_file
+            all_metadata, new_metadata, organized, categorized_urls, reset, output_file,
+            on_progress=lambda done, total: status.update(
+                f"[bold blue]Phase 3 — Categorized {done}/{total} repos with AI...[/bold blue]"
+            ),
+            use_batch=batch,
         )
 
     print_phase(3, "Categorize", {"categories": len(organized)})
@@ -150,7 +164,9 @@ def _run(
         return
 
     with console.status("[bold blue]Phase 4 — Syncing to GitHub...[/bold blue]"):
-        total, success, skipped_cats = phase_4_sync(organized, already_synced, reset, state_file)
+        total, success, skipped_cats = phase_4_sync(
+            organized, already_synced, reset, state_file, compact_state
+        )
 
     print_phase(4, "GitHub Sync", {"synced": success, "total": total})
     if skipped_cats:
@@ -158,8 +174,82 @@ def _run(
     print_summary(organized)
 
 
+def _prompt_run_options(action: str) -> Optional[dict]:
+    reset = action == "reset"
+    sync_only = action == "sync"
+    backup = False
+
+    if reset:
+        confirm = questionary.confirm(
+            "This will DELETE all existing GitHub lists and re-categorize. Continue?",
+            default=False,
+            style=MENU_STYLE,
+        ).ask()
+        if not confirm:
+            console.print("[dim]Cancelled.[/dim]")
+            return None
+        backup = questionary.confirm(
+            "Create a backup first?",
+            default=True,
+            style=MENU_STYLE,
+        ).ask()
+        if backup is None:
+            console.print("[dim]Cancelled.[/dim]")
+            return None
+
+    test_limit = 0
+    if not sync_only:
+        limit_str = questionary.text(
+            "Limit repos? (number, or 0 for all)",
+            default="0",
+            validate=lambda x: True if x.isdigit() else "Enter a number",
+            style=MENU_STYLE,
+        ).ask()
+        if limit_str is None:
+            console.print("[dim]Cancelled.[/dim]")
+            return None
+        test_limit = int(limit_str) if limit_str.isdigit() else 0
+
+    return {
+        "reset": reset,
+        "backup": backup,
+        "organize_only": action == "organize",
+        "sync_only": sync_only,
+        "test_limit": test_limit,
+    }
+
+
+def _run_action(
+    action: str,
+    output_file: str,
+    state_file: str,
+    token_checks: Dict[bool, Tuple[bool, str]],
+):
+    from star_organizer.pipeline import validate_tokens
+
+    sync_only = action == "sync"
+    if sync_only not in token_checks:
+        token_checks[sync_only] = validate_tokens(sync_only=sync_only)
+    ok, err = token_checks[sync_only]
+    if not ok:
+        print_error(err)
+        return
+
+    options = _prompt_run_options(action)
+    if options is None:
+        return
+    try:
+        _run(output_file=output_file, state_file=state_file, skip_validate=True, **options)
+    except SystemExit as se:
+        if se.code not in (None, 0):
+            raise
+    except Exception as e:
+        print_error(f"Unexpected error: {e}")
+
+
 def _interactive(output_file: str, state_file: str):
     print_banner()
+    token_checks: Dict[bool, Tuple[bool, str]] = {}
 
     while True:
         action = questionary.select(
@@ -174,63 +264,8 @@ def _interactive(output_file: str, state_file: str):
 
         if action == "preview":
             _preview(output_file)
-            console.print()
-            continue
-
-        reset = action == "reset"
-        organize_only = action == "organize"
-        sync_only = action == "sync"
-        backup = False
-
-        if reset:
-            confirm = questionary.confirm(
-                "This will DELETE all existing GitHub lists and re-categorize. Continue?",
-                default=False,
-                style=MENU_STYLE,
-            ).ask()
-            if not confirm:
-                console.print("[dim]Cancelled.[/dim]")
-                console.print()
-                continue
-            backup = questionary.confirm(
-                "Create a backup first?",
-                default=True,
-                style=MENU_STYLE,
-            ).ask()
-            if backup is None:
-                console.print("[dim]Cancelled.[/dim]")
-                console.print()
-                continue
-
-        test_limit = 0
-        if not sync_only:
-            limit_str = questionary.text(
-                "Limit repos? (number, or 0 for all)",
-                default="0",
-                validate=lambda x: True if x.isdigit() else "Enter a number",
-                style=MENU_STYLE,
-            ).ask()
-            if limit_str is None:
-                console.print("[dim]Cancelled.[/dim]")
-                console.print()
-                continue
-            test_limit = int(limit_str) if limit_str.isdigit() else 0
-
-        try:
-            _run(
-                reset=reset,
-                backup=backup,
-                organize_only=organize_only,
-                sync_only=sync_only,
-                test_limit=test_limit,
-                output_file=output_file,
-                state_file=state_file,
-            )
-        except SystemExit as se:
-            if se.code not in (None, 0):
-                raise
-        except Exception as e:
-            print_error(f"Unexpected error: {e}")
+        else:
+            _run_action(action, output_file, state_file, token_checks)
         console.print()
 
 
@@ -241,6 +276,7 @@ def cli(
     organize_only: bool = typer.Option(False, "--organize-only", help="Only organize, skip GitHub sync"),
     sync_only: bool = typer.Option(False, "--sync-only", help="Only sync existing organized_stars.json"),
     test_limit: int = typer.Option(0, "--test-limit", help="Limit starred repos fetched (for testing)"),
+    batch: bool = typer.Option(False, "--batch", help="Categorize via the OpenAI Batch API (cheaper, may take hours)"),
     output_file: str = typer.Option(OUTPUT_FILE, "--output-file", help="Path to organized_stars.json"),
     state_file: str = typer.Option(SYNC_STATE_FILE, "--state-file", help="Path to sync state file"),
     interactive: Optional[bool] = typer.Option(
@@ -263,6 +299,7 @@ def cli(
         output_file=output_file,
         state_file=state_file,
         quiet=not verbose,
+        batch=batch,
     )
 
 
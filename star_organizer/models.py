@@ -1,18 +1,42 @@
 import os
+import re
+from dataclasses import dataclass
 from typing import Any, Dict, List, TypedDict
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
-load_dotenv()
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    github_token: str
+    openai_api_key: str
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        load_dotenv(override=False)
+        return cls(
+            github_token=os.getenv("GITHUB_TOKEN", ""),
+            openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+        )
+
+
+SETTINGS = Settings.from_env()
 
 OUTPUT_FILE = "organized_stars.json"
-SYNC_STATE_FILE = ".sync_to_github_state.json"
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+SYNC_STATE_FILE = ".sync_to_github_state.txt"
+LEGACY_SYNC_STATE_FILE = ".sync_to_github_state.json"
+LLM_CACHE_FILE = ".llm_cache.sqlite3"
+
+GITHUB_REPO_URL_RE = re.compile(r"github\.com[:/]+([^/]+)/([^/?#]+)", re.IGNORECASE)
+
+OPENAI_MODEL = "gpt-4.1-2025-04-14"
 
 README_LINES_TO_FETCH = 150
 GITHUB_API_TIMEOUT_SECONDS = 10
+HTTP_POOL_SIZE = 32
+HTTP_MAX_RETRIES = 5
+HTTP_RETRY_BACKOFF = 2.0
 MAX_TOPICS_TO_INCLUDE = 50
 MAX_GITHUB_LISTS = 32
 MAX_CATEGORIZATION_RETRIES = 3
@@ -30,10 +54,15 @@ MAX_GQL_RETRIES = 5
 RETRY_BACKOFF_BASE = 2.0
 GITHUB_ERROR_RETRY_DELAY = 3.0
 PROGRESS_INTERVAL = 20
+SYNC_STATE_COMPACT_RATIO = 1.5
 
 PARALLEL_METADATA_WORKERS = 15
+STARRED_PAGE_WORKERS = 8
 PARALLEL_CATEGORIZATION_WORKERS = 100
 BATCH_SAVE_INTERVAL = 20
+BATCH_POLL_INTERVAL_SECONDS = 30
+BATCH_POLL_MAX_ERRORS = 10
+BATCH_STATE_SUFFIX = ".batch"
 
 
 class CategoryNameAndDescription(BaseModel):
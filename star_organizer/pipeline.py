@@ -1,11 +1,14 @@
+import logging
 import os
+import shutil
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Set, Tuple
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
 
 import structlog
 
-from star_organizer.categorizer import categorize_repos, create_categories
+from star_organizer.categorizer import ProgressFn, batch_categorize, categorize_repos, create_categories
 from star_organizer.github_client import extract_repos_metadata, fetch_starred_repos
 from star_organizer.github_sync import (
     add_repos_to_lists,
@@ -15,13 +18,14 @@ from star_organizer.github_sync import (
     parse_repo_url,
     resolve_list_ids,
 )
+from star_organizer.llm_cache import LLM_CACHE
 from star_organizer.models import (
-    GITHUB_TOKEN,
+    LLM_CACHE_FILE,
     MAX_GITHUB_LISTS,
-    OPENAI_API_KEY,
     OUTPUT_FILE,
     RATE_LIMIT_ITEM,
     RATE_LIMIT_LIST,
+    SETTINGS,
     SYNC_STATE_FILE,
     OrganizedStarLists,
     RepoMetadata,
@@ -29,6 +33,7 @@ from star_organizer.models import (
 from star_organizer.rate_limiter import RateLimiter
 from star_organizer.store import (
     canonicalize_repo_url,
+    compact_sync_state,
     extract_all_repo_urls,
     load_organized_stars,
     load_sync_state,
@@ -40,9 +45,9 @@ LOGGER = structlog.get_logger()
 
 
 def validate_tokens(sync_only: bool = False) -> Tuple[bool, str]:
-    if not GITHUB_TOKEN:
+    if not SETTINGS.github_token:
         return False, "GITHUB_TOKEN is not set"
-    if not sync_only and not OPENAI_API_KEY:
+    if not sync_only and not SETTINGS.openai_api_key:
         return False, "OPENAI_API_KEY is not set (required for categorization)"
     return True, ""
 
@@ -51,31 +56,45 @@ def create_backup(output_file: str) -> str:
     if not os.path.exists(output_file):
         return ""
     backup_path = f"{output_file}.backup.{int(time.time())}"
-    with open(output_file, "r", encoding="utf-8") as src:
-        with open(backup_path, "w", encoding="utf-8") as dst:
-            dst.write(src.read())
+    shutil.copyfile(output_file, backup_path)
     return backup_path
 
 
+def _needs_new_categories(organized: OrganizedStarLists, reset: bool) -> bool:
+    return not organized or len(organized) < MAX_GITHUB_LISTS or reset
+
+
+@dataclass(slots=True)
+class _SyncTask:
+    category: str
+    owner: str
+    name: str
+    url: str
+    repo_id: str = ""
+    list_id: str = ""
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+
 def phase_1_fetch_and_load(
     reset: bool,
     state_file: str,
     output_file: str,
     test_limit: int,
-) -> Tuple[List[dict], OrganizedStarLists, Set[str]]:
+) -> Tuple[List[dict], OrganizedStarLists, Set[str], Set[str], bool]:
     LOGGER.info("phase_1_fetch_and_load")
 
-    with ThreadPoolExecutor(max_workers=2) as ex:
+    with ThreadPoolExecutor(max_workers=3) as ex:
         repos_future = ex.submit(fetch_starred_repos, test_limit)
-
-        def load_state():
-            organized = {} if reset else load_organized_stars(output_file)
-            synced = set() if reset else load_sync_state(state_file)
-            return organized, synced
-
-        state_future = ex.submit(load_state)
+        organized_future = ex.submit(lambda: {} if reset else load_organized_stars(output_file))
+        synced_future = ex.submit(lambda: (set(), False) if reset else load_sync_state(state_file))
         repos = repos_future.result()
-        organized, already_synced = state_future.result()
+        organized = organized_future.result()
+        already_synced, compact_state = synced_future.result()
+
+    categorized_urls = extract_all_repo_urls(organized)
 
     LOGGER.info(
         "phase_1_complete",
@@ -83,18 +102,20 @@ def phase_1_fetch_and_load(
         existing_categories=len(organized),
         already_synced=len(already_synced),
     )
-    return repos, organized, already_synced
+    return repos, organized, already_synced, categorized_urls, compact_state
 
 
 def phase_2_metadata(
     repos: List[dict],
     organized: OrganizedStarLists,
+    categorized_urls: Set[str],
     reset: bool,
 ) -> Tuple[List[RepoMetadata], List[RepoMetadata]]:
     LOGGER.info("phase_2_metadata_extraction")
 
-    already_categorized = extract_all_repo_urls(organized) if not reset else set()
-    all_metadata = extract_repos_metadata(repos)
+    already_categorized = categorized_urls if not reset else set()
+    skip_readme = set() if _needs_new_categories(organized, reset) else already_categorized
+    all_metadata = extract_repos_metadata(repos, skip_readme_urls=skip_readme)
 
     new_metadata = [
         m for m in all_metadata
@@ -114,28 +135,28 @@ def phase_3_categorize(
     all_metadata: List[RepoMetadata],
     new_metadata: List[RepoMetadata],
     organized: OrganizedStarLists,
+    categorized_urls: Set[str],
     reset: bool,
     output_file: str,
+    on_progress: Optional[ProgressFn] = None,
+    use_batch: bool = False,
 ) -> OrganizedStarLists:
     LOGGER.info("phase_3_categorization")
+    LLM_CACHE.use_path(os.path.join(os.path.dirname(output_file), LLM_CACHE_FILE))
 
-    need_categories = not organized or len(organized) < MAX_GITHUB_LISTS or reset
+    need_categories = _needs_new_categories(organized, reset)
     repos_to_categorize = list(new_metadata)
 
     if need_categories:
         LOGGER.info("creating_new_categories", using_repos=len(all_metadata))
-        categories = create_categories(all_metadata)
+        categories = create_categories(all_metadata, refresh_cache=reset)
 
-        old_repo_urls: set = set()
-        if not reset:
-            old_repo_urls = extract_all_repo_urls(organized)
+        old_repo_urls = categorized_urls if not reset else set()
 
         organized = {
             name: {"description": desc, "repos": []}
             for name, desc in categories.items()
         }
-        save_organized_stars(output_file, organized)
-        LOGGER.info("categories_saved", count=len(organized))
 
         if old_repo_urls:
             metadata_by_url = {m["url"]: m for m in all_metadata}
@@ -146,9 +167,19 @@ def phase_3_categorize(
 
     if not repos_to_categorize:
         LOGGER.info("no_repos_to_categorize")
+        if need_categories:
+            save_organized_stars(output_file, organized)
+            LOGGER.info("categories_saved", count=len(organized))
         return organized
 
-    count = categorize_repos(repos_to_categorize, organized, save_organized_stars, output_file)
+    if use_batch:
+        count = batch_categorize(
+            repos_to_categorize, organized, save_organized_stars, output_file, on_progress, refresh_cache=reset
+        )
+    else:
+        count = categorize_repos(
+            repos_to_categorize, organized, save_organized_stars, output_file, on_progress, refresh_cache=reset
+        )
     LOGGER.info("phase_3_complete", categorized=count)
     return organized
 
@@ -158,17 +189,16 @@ def phase_4_sync(
     already_synced: Set[str],
     reset: bool,
     state_file: str,
+    compact_state: bool = False,
 ) -> Tuple[int, int, int]:
     LOGGER.info("phase_4_github_sync", reset=reset)
 
     list_limiter = RateLimiter(RATE_LIMIT_LIST)
     item_limiter = RateLimiter(RATE_LIMIT_ITEM)
 
-    tasks: List[Tuple[str, str, str]] = []
+    tasks: List[_SyncTask] = []
     for cat_name, cat_data in organized.items():
         for repo in cat_data.get("repos", []):
-            if not isinstance(repo, dict):
-                continue
             url = canonicalize_repo_url(repo.get("url", ""))
             if not url:
                 continue
@@ -177,13 +207,15 @@ def phase_4_sync(
             owner, name = parse_repo_url(url)
             if not owner or not name:
                 continue
-            tasks.append((cat_name, f"{owner}/{name}", url))
+            tasks.append(_SyncTask(cat_name, owner, name, url))
 
     if not tasks:
         LOGGER.info("nothing_to_sync")
+        if compact_state:
+            compact_sync_state(state_file, already_synced)
         return 0, 0, 0
 
-    repo_pairs = list({(t[1].split("/")[0], t[1].split("/")[1]) for t in tasks})
+    repo_pairs = list({(t.owner, t.name) for t in tasks})
     LOGGER.info("sync_plan", repos_to_sync=len(tasks), unique_repos=len(repo_pairs))
 
     with ThreadPoolExecutor(max_workers=2) as ex:
@@ -202,27 +234,19 @@ def phase_4_sync(
 
     LOGGER.info("repo_ids_resolved", found=len(repo_ids), total=len(repo_pairs))
 
-    needed_categories = {t[0] for t in tasks}
+    needed_categories = {t.category for t in tasks}
     list_ids = resolve_list_ids(organized, list_limiter, needed_categories)
     LOGGER.info("lists_ready", count=len(list_ids))
 
-    ops: List[Tuple[str, str, str, str]] = []
-    full_name_to_url: Dict[str, str] = {}
-    skipped = 0
-    missing_lists: set = set()
-
-    for cat_name, repo_full, repo_url in tasks:
-        list_id = list_ids.get(cat_name, "")
-        if not list_id:
-            missing_lists.add(cat_name)
-            continue
-        owner, name = repo_full.split("/", 1)
-        rid = repo_ids.get((owner, name), "")
-        if not rid:
-            skipped += 1
-            continue
-        ops.append((cat_name, rid, repo_full, list_id))
-        full_name_to_url[repo_full] = repo_url
+    for t in tasks:
+        t.repo_id = repo_ids.get((t.owner, t.name), "")
+        t.list_id = list_ids.get(t.category, "")
+
+    missing_lists = {t.category for t in tasks if not t.list_id}
+    skipped = sum(1 for t in tasks if t.list_id and not t.repo_id)
+    ready = [t for t in tasks if t.repo_id and t.list_id]
+    ops = [(t.category, t.repo_id, t.full_name, t.list_id) for t in ready]
+    full_name_to_url = {t.full_name: t.url for t in ready}
 
     if missing_lists:
         LOGGER.warning("categories_skipped_no_list_id", categories=sorted(missing_lists), count=len(missing_lists))
@@ -241,21 +265,30 @@ def phase_4_sync(
         success_rate=f"{rate:.1f}%",
     )
 
-    if stats:
-        for cat, count in sorted(stats.items(), key=lambda x: x[1], reverse=True):
-            LOGGER.info("category_sync_stats", category=format_list_name(cat), count=count)
+    if stats and LOGGER.is_enabled_for(logging.INFO):
+        LOGGER.info(
+            "category_sync_stats",
+            entries=[
+                {"category": format_list_name(cat), "count": count}
+                for cat, count in sorted(stats.items(), key=lambda x: x[1], reverse=True)
+            ],
+        )
 
     if error_types:
-        for etype, count in sorted(error_types.items(), key=lambda x: x[1], reverse=True):
-            LOGGER.warning("sync_error_type", error_type=etype, count=count)
-
-    newly_synced = {
-        full_name_to_url.get(n) or canonicalize_repo_url(f"https://github.com/{n}")
-        for n in ok_repos
-    }
-    newly_synced = {u for u in newly_synced if u}
-    updated = set(already_synced) | newly_synced
-    save_sync_state(state_file, updated)
-    LOGGER.info("sync_state_saved", total_synced=len(updated), newly_added=len(newly_synced))
+        LOGGER.warning(
+            "sync_error_types",
+            entries=[
+                {"error_type": etype, "count": count}
+                for etype, count in sorted(error_types.items(), key=lambda x: x[1], reverse=True)
+            ],
+        )
+
+    newly_synced = {full_name_to_url[n] for n in ok_repos if n in full_name_to_url}
+    if reset or compact_state:
+        compact_sync_state(state_file, already_synced | newly_synced)
+    else:
+        save_sync_state(state_file, newly_synced - already_synced)
+    total_synced = len(already_synced | newly_synced)
+    LOGGER.info("sync_state_saved", total_synced=total_synced, newly_added=len(newly_synced))
 
     return total, success, len(missing_lists)
@@ -11,14 +11,12 @@ class RateLimiter:
     def acquire(self) -> None:
         if self.min_interval_seconds <= 0:
             return
-        while True:
-            with self._lock:
-                now = time.monotonic()
-                if now >= self._next_time:
-                    self._next_time = now + self.min_interval_seconds
-                    return
-                sleep_for = self._next_time - now
-            time.sleep(sleep_for)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time)
+            self._next_time = slot + self.min_interval_seconds
+        if slot > now:
+            time.sleep(slot - now)
 
     def slow_down(self, factor: float = 1.5) -> None:
         with self._lock:
@@ -1,11 +1,17 @@
-import json
+import functools
 import os
-from datetime import datetime, timezone
-from typing import Set
+from typing import Set, Tuple
 
+import orjson
 import structlog
 
-from star_organizer.models import OrganizedStarLists
+from star_organizer.models import (
+    GITHUB_REPO_URL_RE,
+    LEGACY_SYNC_STATE_FILE,
+    SYNC_STATE_COMPACT_RATIO,
+    SYNC_STATE_FILE,
+    OrganizedStarLists,
+)
 
 LOGGER = structlog.get_logger()
 
@@ -14,11 +20,14 @@ def load_organized_stars(path: str) -> OrganizedStarLists:
     if not os.path.exists(path):
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data: OrganizedStarLists = json.load(f)
+        with open(path, "rb") as f:
+            data: OrganizedStarLists = orjson.loads(f.read())
         for list_data in data.values():
-            if "repos" not in list_data:
-                list_data["repos"] = []
+            list_data["repos"] = [
+                {"url": repo} if isinstance(repo, str) else repo
+                for repo in list_data.get("repos", [])
+                if isinstance(repo, (str, dict))
+            ]
             if "description" not in list_data:
                 list_data["description"] = ""
         return data
@@ -27,63 +36,88 @@ def load_organized_stars(path: str) -> OrganizedStarLists:
         return {}
 
 
+def _atomic_write(path: str, payload: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
 def save_organized_stars(path: str, data: OrganizedStarLists) -> None:
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        _atomic_write(path, orjson.dumps(data, option=orjson.OPT_INDENT_2))
     except Exception as e:
         LOGGER.error("save_organized_stars_failed", file=path, error=str(e))
 
 
+@functools.lru_cache(maxsize=65536)
 def canonicalize_repo_url(url: str) -> str:
-    import re
-
     s = (url or "").strip()
     if not s:
         return ""
     s = s.replace(".git", "")
-    m = re.search(r"github\.com[:/]+([^/]+)/([^/?#]+)", s, re.IGNORECASE)
+    m = GITHUB_REPO_URL_RE.search(s)
     if not m:
         return s
     return f"https://github.com/{m.group(1)}/{m.group(2)}"
 
 
-def load_sync_state(path: str) -> Set[str]:
-    if not path or not os.path.exists(path):
+def _legacy_sync_urls(raw: str) -> Set[str]:
+    data = orjson.loads(raw) or {}
+    urls = data.get("synced_repo_urls", [])
+    if not isinstance(urls, list):
         return set()
+    return {canonicalize_repo_url(u) for u in urls if isinstance(u, str) and u.strip()}
+
+
+def load_sync_state(path: str) -> Tuple[Set[str], bool]:
+    if not path:
+        return set(), False
+    source = path
+    if not os.path.exists(path):
+        if path != SYNC_STATE_FILE or not os.path.exists(LEGACY_SYNC_STATE_FILE):
+            return set(), False
+        source = LEGACY_SYNC_STATE_FILE
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f) or {}
-        urls = data.get("synced_repo_urls", [])
-        if not isinstance(urls, list):
-            return set()
-        return {canonicalize_repo_url(u) for u in urls if isinstance(u, str) and u.strip()}
+        with open(source, "r", encoding="utf-8") as f:
+            raw = f.read()
+        if raw.lstrip().startswith("{"):
+            return _legacy_sync_urls(raw), True
+        lines = [line.strip() for line in raw.splitlines() if line.strip()]
+        urls = set(lines)
+        return urls, source != path or len(lines) > SYNC_STATE_COMPACT_RATIO * len(urls)
     except Exception as e:
-        LOGGER.warning("sync_state_load_failed", file=path, error=str(e))
-        return set()
+        LOGGER.warning("sync_state_load_failed", file=source, error=str(e))
+        return set(), True
 
 
-def save_sync_state(path: str, synced_urls: Set[str]) -> None:
+def save_sync_state(path: str, new_urls: Set[str]) -> None:
+    if not path or not new_urls:
+        return
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(f"{u}\n" for u in new_urls)
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception as e:
+        LOGGER.error("sync_state_save_failed", file=path, error=str(e))
+
+
+def compact_sync_state(path: str, synced_urls: Set[str]) -> None:
     if not path:
         return
-    payload = {
-        "version": 1,
-        "last_updated_at": datetime.now(timezone.utc).isoformat(),
-        "synced_repo_urls": sorted(synced_urls),
-    }
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, ensure_ascii=False)
+        _atomic_write(path, "".join(f"{u}\n" for u in sorted(synced_urls)).encode("utf-8"))
     except Exception as e:
         LOGGER.error("sync_state_save_failed", file=path, error=str(e))
 
 
 def extract_all_repo_urls(organized: OrganizedStarLists) -> Set[str]:
-    urls: Set[str] = set()
-    for list_data in organized.values():
-        for repo in list_data.get("repos", []):
-            if isinstance(repo, dict):
-                urls.add(repo.get("url", ""))
-            else:
-                urls.add(repo)
-    return urls
+    return {
+        repo["url"]
+        for list_data in organized.values()
+        for repo in list_data.get("repos", [])
+        if repo.get("url")
+    }